@@ -1,9 +1,24 @@
-import re, json, requests, os
+import re, json, requests, os, queue, threading, functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pyairtable import Table
 
-DATETIME_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{3}))?Z")
-DATE_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# orjson is optional, it only makes loading large field maps faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# the largest page size the Airtable API allows
+AIRTABLE_PAGE_SIZE = 100
+
+DATE_OR_DATETIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2}(?:\.\d{3})?Z)?")
 NUMERIC_PATTERN = re.compile(r"(\D*)([\d,]+(?:\.\d+)?)(\D*)")
+THOUSANDS_SEPARATOR_TABLE = str.maketrans("", "", ",")
+NEWLINE_TO_SPACE_TABLE = str.maketrans("\n", " ")
 
 def __prefer_single_value(value):
     """
@@ -11,7 +26,7 @@ def __prefer_single_value(value):
     If the value is an empty list, returns None.
     """
 
-    if type(value) is list:
+    if isinstance(value, list):
         if len(value) == 0:
             return None
         elif len(value) == 1:
@@ -26,13 +41,23 @@ def __require_single_value(value):
     Otherwise, throws an error.
     """
 
-    value = __prefer_single_value(value)
-    if type(value) is list:
+    # same as __prefer_single_value, inlined since this runs for almost every cell
+    if isinstance(value, list):
+        if len(value) == 0:
+            return None
+        elif len(value) == 1:
+            return value[0]
+
         raise Exception("Single value required")
 
     return value
 
 def __require_numeric_value(value):
+    """
+    Returns the value as an int or float, parsing it if it is a string.
+    If the value is None, an empty string, or an empty list, returns None.
+    """
+
     value = __require_single_value(value)
     if value is None or value == "":
         return None
@@ -40,11 +65,19 @@ def __require_numeric_value(value):
     if type(value) in (int, float):
         return value
 
+    # plain numbers like "1,234.5" don't need the pattern, which is only for values with a prefix or suffix
+    # separators are only removed before the decimal point, anything else after it is left to the pattern
+    integer, point, fraction = value.partition(".")
+    integer = integer.translate(THOUSANDS_SEPARATOR_TABLE)
+    if integer.isdecimal() and (fraction.isdecimal() or not point):
+        return float(integer + point + fraction) if point else int(integer)
+
     match = NUMERIC_PATTERN.match(value)
     if not match:
         raise Exception("Invalid numeric format: " + value)
     
-    return match.group(2).replace(",", "")
+    number = match.group(2).replace(",", "")
+    return float(number) if "." in number else int(number)
 
 def __require_single_value_string(value, field_data):
     value = __require_single_value(value)
@@ -54,34 +87,51 @@ def __require_single_value_string(value, field_data):
     return str(value)
 
 def __to_text(value, field_data):
+    """
+    Converts the value to a single line of text, joining lists with commas.
+
+    >>> __to_text(["a", 1, "b\\nc"], {})
+    'a, 1, b c'
+    """
+
     value = __prefer_single_value(value)
-    if type(value) is list:
-        return ", ".join(value.map(str)).replace("\n", " ")
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value).translate(NEWLINE_TO_SPACE_TABLE)
     elif value is None:
         return ""
     else:
-        return str(value).replace("\n", " ")
+        return str(value).translate(NEWLINE_TO_SPACE_TABLE)
     
 def __to_long_text(value, field_data):
+    """
+    Converts the value to text, putting each element of a list on its own line.
+
+    >>> __to_long_text(["a", 1], {})
+    'a\\n1'
+    """
+
     value = __prefer_single_value(value)
-    if type(value) is list:
-        return "\n".join(value.map(str))
+    if isinstance(value, list):
+        return "\n".join(str(v) for v in value)
     elif value is None:
         return ""
     else:
         return str(value)
 
-def __to_number(value, field_data):
+def __to_number(value, field_data, scale=None):
     value = __require_numeric_value(value)
     if value is None:
         return None
 
-    precision = field_data["number_decimal_places"]
-    if precision == 0:
+    # the scale is normally computed once per field, see __compile_conversion_plan
+    if field_data["number_decimal_places"] == 0:
         value = int(value)
 
     else:
-        value = int(float(value) * 10 ** precision) / 10 ** precision
+        if scale is None:
+            scale = 10 ** field_data["number_decimal_places"]
+
+        value = int(value * scale) / scale
 
     if not field_data["number_negative"] and value < 0:
         value = 0
@@ -110,38 +160,52 @@ def __to_date(value, field_data):
     if value is None or value == "":
         return None
     
+    # dates are accepted with or without a time, but a time is required when the field includes one
+    match = DATE_OR_DATETIME_PATTERN.fullmatch(value)
     if field_data["date_include_time"]:
-        if not DATETIME_PATTERN.match(value):
+        if not match or match.group(1) is None:
             raise Exception("Invalid datetime format")
         
-    else:
-        if not DATE_PATTERN.match(value):
-            raise Exception("Invalid date format")
+    elif not match:
+        raise Exception("Invalid date format")
     
     return value
 
-def __find_select_option_id(value, select_options):
+def __select_option_ids(field_data):
+    """
+    Returns a mapping of the select option values of the field to their ids.
+    """
+
+    # iterate in reverse so the first option wins if there are duplicate values
+    return { option["value"]: option["id"] for option in reversed(field_data["select_options"]) }
+
+def __find_select_option_id(value, option_ids):
     value = str(value)
-    for option in select_options:
-        if option["value"] == value:
-            return option["id"]
-    
-    raise Exception("Invalid select option: " + value)
+    if value not in option_ids:
+        raise Exception("Invalid select option: " + value)
+
+    return option_ids[value]
 
-def __to_single_select(value, field_data):
+def __to_single_select(value, field_data, option_ids=None):
     value = __require_single_value(value)
     if value is None or value == "":
         return None
     
-    return __find_select_option_id(value, field_data["select_options"])
+    if option_ids is None:
+        option_ids = __select_option_ids(field_data)
+
+    return __find_select_option_id(value, option_ids)
 
-def __to_multi_select(value, field_data):
+def __to_multi_select(value, field_data, option_ids=None):
     if value is None or value == "":
         return None
     
+    if option_ids is None:
+        option_ids = __select_option_ids(field_data)
+
     selected = []
     for v in value:
-        selected.append(__find_select_option_id(v, field_data["select_options"]))
+        selected.append(__find_select_option_id(v, option_ids))
     
     return selected
 
@@ -160,58 +224,339 @@ CONVERSION_FUNCTIONS = {
     "phone_number": __require_single_value_string,
 }
 
-def __convert_fields(fields, fields_map, fields_data, conversion_functions, links, files):
+def __is_link_list(value):
+    """
+    Returns whether the value is an Airtable link field value, a list of record ids.
+    """
+
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+def __is_attachment_list(value):
+    """
+    Returns whether the value is an Airtable attachment field value, a list of objects with file URLs.
+    """
+
+    return isinstance(value, list) and all(isinstance(v, dict) and "url" in v for v in value)
+
+def __bind_conversion_function(conversion_function, field_data, default_conversion_function):
+    """
+    Returns a function that takes an Airtable field value and runs the user defined conversion function on it.
+    """
+
+    return lambda value : conversion_function(value, field_data, default_conversion_function)
+
+def __compile_conversion_plan(fields_map, fields_data, conversion_functions):
+    """
+    given the mapping of Airtable field names to Baserow field ids, the Baserow fields data, and the user defined conversion functions,
+    returns a list of (Airtable field name, Baserow field key, Baserow field type, conversion function) tuples,
+    so the fields only have to be looked up once per table instead of once per record.
+    Link and file fields have no conversion function, since they are filled in after the records are created.
+    """
+
+    plan = []
+    for at_field_name, br_field_id in fields_map.items():
+        if br_field_id not in fields_data:
+            raise Exception("Baserow field not found: field_" + str(br_field_id))
+
+        field_data = fields_data[br_field_id]
+        br_field_key = f"field_{br_field_id}"
+        br_field_type = field_data["type"]
+        if br_field_type in ("link_row", "file"):
+            plan.append((at_field_name, br_field_key, br_field_type, None))
+            continue
+
+        if br_field_type not in CONVERSION_FUNCTIONS:
+            raise Exception("Can't import into Baserow field: field_" + str(br_field_id) + ", unsupported field type: " + br_field_type)
+
+        # values derived from the field data are computed once per field and bound to the default conversion function,
+        # so the field data itself stays exactly as returned by the Baserow API
+        precomputed = {}
+        if br_field_type == "number":
+            precomputed["scale"] = 10 ** field_data["number_decimal_places"]
+
+        elif br_field_type in ("single_select", "multiple_select"):
+            precomputed["option_ids"] = __select_option_ids(field_data)
+
+        # use the custom conversion function if one is defined, otherwise use the default conversion function
+        conversion_function = functools.partial(CONVERSION_FUNCTIONS[br_field_type], field_data=field_data, **precomputed)
+        if br_field_id in conversion_functions:
+            conversion_function = __bind_conversion_function(conversion_functions[br_field_id], field_data, conversion_function)
+
+        plan.append((at_field_name, br_field_key, br_field_type, conversion_function))
+
+    return plan
+
+def __convert_fields(fields, conversion_plan, links, files):
     """
-    given the Airtable fields, the mapping of Airtable field names to Baserow field ids,
-    the Baserow fields data, and the user defined conversion functions,
+    given the Airtable fields and the conversion plan for the table (see `__compile_conversion_plan`),
     returns an object that can be submitted to the Baserow API to create a new row with the data from the Airtable fields.
     """
 
     converted_fields = {}
-    for at_field_name, at_field_value in fields.items():
-        if at_field_name not in fields_map:
+    for at_field_name, br_field_key, br_field_type, conversion_function in conversion_plan:
+        if at_field_name not in fields:
             continue
-        
-        br_field_id = fields_map[at_field_name]
-        if br_field_id not in fields_data:
-            raise Exception("Baserow field not found: field_" + str(br_field_id))
-        
-        br_field_type = fields_data[br_field_id]["type"]
+
+        at_field_value = fields[at_field_name]
 
         # store the linked records for later conversion
         if br_field_type == "link_row":
-            if type(at_field_value) is not list or (len(at_field_value) > 0 and type(at_field_value[0]) is not str):
+            if not __is_link_list(at_field_value):
                 raise Exception("Baserow link fields can only be mapped from Airtable link fields")
 
-            links[br_field_id] = at_field_value
+            links[br_field_key] = at_field_value
             continue
 
         # store the file for later upload
         if br_field_type == "file":
-            if type(at_field_value) is not list or (len(at_field_value) > 0 and (type(at_field_value[0]) is not dict or "url" not in at_field_value[0])):
+            if not __is_attachment_list(at_field_value):
                 raise Exception("Baserow file fields can only be mapped from Airtable attachment fields")
             
-            files[br_field_id] = at_field_value
+            files[br_field_key] = at_field_value
             continue
 
-        if br_field_type not in CONVERSION_FUNCTIONS:
-            raise Exception("Can't import into Baserow field: field_" + str(br_field_id) + ", unsupported field type: " + br_field_type)
-
-        # run the custom conversion function if one is defined, otherwise run the default conversion function
-        default_conversion_function = CONVERSION_FUNCTIONS[br_field_type]
-        br_field_value = None
-        if br_field_id in conversion_functions:
-            br_field_value = conversion_functions[br_field_id](at_field_value, fields_data[br_field_id], lambda val : default_conversion_function(val, fields_data[br_field_id]))
-        
-        else:
-            br_field_value = default_conversion_function(at_field_value, fields_data[br_field_id])
-        
+        br_field_value = conversion_function(at_field_value)
         if br_field_value is not None:
-            converted_fields["field_" + str(br_field_id)] = br_field_value
+            converted_fields[br_field_key] = br_field_value
     
     return converted_fields
 
-def do_import(field_map_fp: str, airtable_token: str, baserow_token:str, conversion_functions: dict[int, callable] = {}, batch_size: int = 200, baserow_url: str = "https://api.baserow.io", quiet: bool = False):
+def __batched(iterable, n):
+    """
+    Yields lists of up to n items from the iterable, like `itertools.batched` in Python 3.12+.
+    """
+
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+def __iterate_in_background(pages, maxsize):
+    """
+    Iterates over the pages of records in a background thread, yielding the records one at a time,
+    so the next page can be fetched from Airtable while the current batch is being created in Baserow.
+    At most `maxsize` pages are buffered. Errors raised while fetching are re-raised in the calling thread.
+    The background thread stops once this generator is exhausted or closed, so callers that might stop early should close it.
+    """
+
+    # whole pages are queued rather than single records, so the queue is only locked once per page
+    fetched_pages = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        """
+        Puts the item in the queue, waiting for space until the consumer has stopped.
+        Returns whether the item was queued.
+        """
+
+        while not stopped.is_set():
+            try:
+                fetched_pages.put(item, timeout=0.1)
+                return True
+
+            except queue.Full:
+                pass
+
+        return False
+
+    def producer():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+
+            put(None)
+
+        except Exception as e:
+            put(e)
+
+    threading.Thread(target=producer, daemon=True).start()
+    try:
+        while True:
+            page = fetched_pages.get()
+            if page is None:
+                return
+
+            if isinstance(page, Exception):
+                raise page
+
+            yield from page
+
+    finally:
+        stopped.set()
+
+class __RateLimitRetry(Retry):
+    """
+    Retries requests of any method when the server responds with 429 Too Many Requests,
+    since the request was rejected without being processed, so replaying it can't create duplicate rows.
+    Other statuses are only retried for idempotent methods, like the base class.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429:
+            return True
+
+        return super().is_retry(method, status_code, has_retry_after)
+
+def __create_session():
+    """
+    Creates a requests session that keeps connections alive between calls,
+    and retries requests that fail because of rate limiting or an unavailable server.
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=__RateLimitRetry(total=5, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], raise_on_status=False))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def __upload_file(file_data, api_url, baserow_session, airtable_session):
+    """
+    Downloads an Airtable attachment and uploads it to Baserow, returning the name of the uploaded Baserow file.
+    """
+
+    download = airtable_session.get(file_data["url"])
+    if(download.status_code >= 400):
+        raise Exception("Error downloading file: " + file_data["filename"] + ", status code: " + str(download.status_code))
+
+    response = baserow_session.post(api_url + "/user-files/upload-file/", files={ "file": (file_data["filename"], download.content, file_data["type"]) })
+    if(response.status_code >= 400):
+        raise Exception("Error uploading file: " + response.text)
+
+    return response.json()["name"]
+
+def __update_record(record_id, link_fields, file_fields):
+    """
+    Returns an object that can be submitted to the Baserow API to fill in the link fields and file fields of a record,
+    with the linked Baserow record ids and the uploaded files.
+    """
+
+    record = {
+        "id": record_id,
+    }
+
+    record.update(link_fields)
+    for br_field_key, file_names in file_fields.items():
+        record[br_field_key] = [{ "name": file_name } for file_name in file_names]
+
+    return record
+
+def __get_fields_data(br_table_id, fields_data_cache, baserow_session, api_url):
+    """
+    Returns a mapping of field ids to the Baserow fields data for the table.
+    The fields data is only requested once per table for the whole import, and is stored in `fields_data_cache`.
+    """
+
+    if br_table_id in fields_data_cache:
+        return fields_data_cache[br_table_id]
+
+    # get the baserow fields data for the table, and convert it to a mapping of field ids to the data
+    response = baserow_session.get(api_url + f"/database/fields/table/{br_table_id}/")
+    if response.status_code >= 400:
+        raise Exception("Error getting Baserow field data: " + response.text)
+
+    br_fields_data_arr = response.json()
+    br_fields_data = {}
+    for field_data in br_fields_data_arr:
+        br_fields_data[field_data["id"]] = field_data
+
+    fields_data_cache[br_table_id] = br_fields_data
+    return br_fields_data
+
+def __stop_on_failure(stop, function, *args):
+    """
+    Runs the function with the given arguments, setting the `stop` event if it raises an error,
+    so the other tables being imported at the same time don't make any more changes.
+    """
+
+    try:
+        return function(*args)
+
+    except Exception:
+        stop.set()
+        raise
+
+def __create_table_records(at_table, br_table_id, fields_map, conversion_functions, fields_data_cache, baserow_session, api_url, batch_size, stop):
+    """
+    Creates a Baserow record for every record in the Airtable table, without filling in the link fields or file fields.
+    Returns a mapping of Airtable record ids to the created Baserow record ids,
+    and the link fields and file fields of each created record, keyed by Baserow record id in the order the records were created.
+    Stops before creating the next batch once the `stop` event is set.
+    """
+
+    br_fields_data = __get_fields_data(br_table_id, fields_data_cache, baserow_session, api_url)
+    conversion_plan = __compile_conversion_plan(fields_map, br_fields_data, conversion_functions)
+
+    # get all the records from airtable, and create them in Baserow
+    # keep track of which airtable records map to which baserow records, so we can fill in the link fields later
+    record_map = {}
+    links = {}
+    files = {}
+    # close the records iterator even if creating a batch fails, so the background fetching thread stops
+    with closing(__iterate_in_background(at_table.iterate(page_size=AIRTABLE_PAGE_SIZE), max(1, batch_size * 2 // AIRTABLE_PAGE_SIZE))) as at_records:
+        for records in __batched(at_records, batch_size):
+            if stop.is_set():
+                break
+
+            create_records = []
+            for record in records:
+                links[record["id"]] = {}
+                files[record["id"]] = {}
+                create_records.append(__convert_fields(record["fields"], conversion_plan, links[record["id"]], files[record["id"]]))
+
+            response = baserow_session.post(api_url + f"/database/rows/table/{br_table_id}/batch/", json={ "items": create_records })
+            if(response.status_code >= 400):
+                raise Exception("Error creating records: " + response.text)
+
+            # re-key the stored link and file fields by the baserow record id, now that we know it
+            for record, item in zip(records, response.json()["items"]):
+                record_map[record["id"]] = item["id"]
+                links[item["id"]] = links.pop(record["id"])
+                files[item["id"]] = files.pop(record["id"])
+
+    return record_map, links, files
+
+def __fill_table_links_and_files(br_table_id, links, files, record_map, upload_executor, baserow_session, airtable_session, api_url, batch_size, stop):
+    """
+    Fills in the link fields and file fields of the created records in the Baserow table,
+    once the records of every table in the base have been created.
+    Both are sent in the same request, so each record is only updated once.
+    Skips the remaining uploads and updates once the `stop` event is set.
+    """
+
+    for br_record_id, record_data in links.items():
+        for br_field_key, at_linked_record_ids in record_data.items():
+            br_linked_record_ids = []
+            for at_linked_record_id in at_linked_record_ids:
+                br_linked_record_ids.append(record_map[at_linked_record_id])
+
+            record_data[br_field_key] = br_linked_record_ids
+
+    # upload all the files in the table concurrently, then replace each airtable attachment with its baserow file name
+    uploads = []
+    for br_record_id, record_data in files.items():
+        for br_field_key, at_files in record_data.items():
+            for i, file_data in enumerate(at_files):
+                uploads.append((at_files, i, file_data))
+
+    file_names = list(upload_executor.map(lambda upload : None if stop.is_set() else __upload_file(upload[2], api_url, baserow_session, airtable_session), uploads))
+    if stop.is_set():
+        return
+
+    for (at_files, i, file_data), file_name in zip(uploads, file_names):
+        at_files[i] = file_name
+
+    # now that we have mapped the baserow record ids and uploaded the files, we can fill in the link fields and file fields
+    # links and files are both keyed by every created record, so their keys are the same
+    update_records = [__update_record(record_id, link_fields, files[record_id]) for record_id, link_fields in links.items() if len(link_fields) > 0 or len(files[record_id]) > 0]
+    for batch in __batched(update_records, batch_size):
+        if stop.is_set():
+            return
+
+        response = baserow_session.patch(api_url + f"/database/rows/table/{br_table_id}/batch/", json={ "items": batch })
+        if(response.status_code >= 400):
+            raise Exception("Error adding linked records and files to records: " + response.text)
+
+def do_import(field_map_fp: str, airtable_token: str, baserow_token:str, conversion_functions: dict[int, callable] = {}, batch_size: int = 200, baserow_url: str = "https://api.baserow.io", quiet: bool = False, upload_workers: int = 16, table_workers: int = 4):
     """
     Imports data from Airtable into Baserow.
     Uses the JSON from the file at the provided `field_map_fp` to map Airtable bases, tables, and fields to Baserow.
@@ -219,6 +564,15 @@ def do_import(field_map_fp: str, airtable_token: str, baserow_token:str, convers
 
     For self-hosted instances of Baserow, the `baserow_url` parameter can be used to specify the URL of the Baserow instance.
 
+    The tables of each base are imported concurrently, using up to `table_workers` threads,
+    and attachments are downloaded from Airtable and uploaded to Baserow concurrently, using up to `upload_workers` threads.
+    Lower these if you are hitting Baserow's rate limits.
+    Each table worker also lists records from Airtable on its own, so `table_workers` multiplies the requests sent to
+    Airtable, which allows 5 requests per second per base. Rate limited Airtable requests are retried with a backoff long
+    enough to outlast Airtable's 30 second lockout, but lowering `table_workers` avoids the wait.
+    If importing one table fails, the other tables stop before their next batch or upload,
+    and the error is raised once the requests already in progress have finished.
+
     Custom conversion functions can be provided for each Baserow field with the `conversion_functions` parameter.
     The keys should be Baserow field IDs and the values should be functions with the following signature:
     ```
@@ -227,163 +581,58 @@ def do_import(field_map_fp: str, airtable_token: str, baserow_token:str, convers
     * `airtable_field_value` is the value returned by the Airtable API for the field.
     * `baserow_field_data` is the data returned by the Baserow API's "List fields" endpoint for the field.
     * `default_conversion_function` is a function that takes a value and runs the default conversion function for this field on it. Typically you would want to either call this on the airtable value first and modify the result, or modify the airtable value first and then call this on that value.
+
+    Since tables are imported concurrently, conversion functions for fields in different tables can run at the same time on different threads,
+    so they must be thread-safe if they share any state. Pass `table_workers=1` to import one table at a time, so they run one at a time.
     """
 
-    with open(field_map_fp) as f:
-        field_map = json.load(f)
-    
-    api_url = baserow_url.strip("/") + "/api"
+    if orjson is not None:
+        with open(field_map_fp, "rb") as f:
+            field_map = orjson.loads(f.read())
 
-    for base_id, base_data in field_map["bases"].items():
-        if not quiet: print(f"Importing records from {base_id}...")
-        created_records = {}
-        record_map = {}
-        links = {}
-        files = {}
-        # first pass, create all the records without filling in the link fields or file fields
-        for at_table_id, table_data in base_data["tables"].items():
-            br_table_id = table_data["id"]
-            created_records[br_table_id] = []
-            links[br_table_id] = {}
-            files[br_table_id] = {}
-
-            # get the baserow fields data for the table, and convert it to a mapping of field ids to the data
-            response = requests.get(api_url + f"/database/fields/table/{br_table_id}/", headers={ "Authorization": "Token " + baserow_token })
-            if response.status_code >= 400:
-                raise Exception("Error getting Baserow field data: " + response.text)
-
-            br_fields_data_arr = response.json()
-            br_fields_data = {}
-            for field_data in br_fields_data_arr:
-                br_fields_data[field_data["id"]] = field_data
-            
-            # get all the records from airtable, and create them in Baserow
-            # keep track of which airtable records map to which baserow records, so we can fill in the link fields later
-            at_ids = []
-            create_records = []
-            at_table = Table(airtable_token, base_id, at_table_id)
-            iterator = (v for v in at_table.all())
-            while True:
-                record = next(iterator, None)
-                if record is not None:
-                    links[br_table_id][record["id"]] = {}
-                    files[br_table_id][record["id"]] = {}
-                    item = __convert_fields(record["fields"], table_data["fields"], br_fields_data, conversion_functions, links[br_table_id][record["id"]], files[br_table_id][record["id"]])
-                    at_ids.append(record["id"])
-                    create_records.append(item)
-
-                if len(create_records) > 0 and (len(create_records) > batch_size - 1 or record is None):
-                    response = requests.post(api_url + f"/database/rows/table/{br_table_id}/batch/", headers={ "Authorization": "Token " + baserow_token }, json={ "items": create_records })
-                    if(response.status_code >= 400):
-                        raise Exception("Error creating records: " + response.text)
-
-                    create_records = []
-
-                    for i, item in enumerate(response.json()["items"]):
-                        created_records[br_table_id].append(item["id"])
-                        record_map[at_ids[i]] = item["id"]
-                    
-                    at_ids = []
-                
-                if record is None:
-                    break
+    else:
+        with open(field_map_fp) as f:
+            field_map = json.load(f)
     
-        # second pass, fill in the link fields
-        if not quiet: print("Mapping linked records...")
-        for br_table_id, table_data in links.items():
-            new_table_data = {}
-            for at_record_id, record_data in table_data.items():
-                br_record_id = record_map[at_record_id]
-                new_table_data[br_record_id] = record_data
-
-            links[br_table_id] = new_table_data
-            for br_record_id, record_data in new_table_data.items():
-                for br_field_id, at_linked_record_ids in record_data.items():
-                    br_linked_record_ids = []
-                    for at_linked_record_id in at_linked_record_ids:
-                        br_linked_record_ids.append(record_map[at_linked_record_id])
-                    
-                    record_data[br_field_id] = br_linked_record_ids
-            
-            # now that we have mapped the baserow record ids, we can fill in the link fields
-            update_records = []
-            already_linked = set()
-            iterator = (v for v in created_records[br_table_id])
-            while True:
-                record_id = next(iterator, None)
-                if record_id is not None:
-                    if record_id in already_linked or record_id not in links[br_table_id] or len(links[br_table_id][record_id]) == 0:
-                        continue
-
-                    record = {
-                        "id": record_id,
-                    }
-
-                    for br_field_id, linked_field_ids in links[br_table_id][record_id].items():
-                        record["field_" + str(br_field_id)] = linked_field_ids
-
-                        for linked_field_id in linked_field_ids:
-                            already_linked.add(linked_field_id)
-
-                    update_records.append(record)
-
-                if len(update_records) > 0 and (len(update_records) > batch_size - 1 or record_id is None):
-                    response = requests.patch(api_url + f"/database/rows/table/{br_table_id}/batch/", headers={ "Authorization": "Token " + baserow_token }, json={ "items": update_records })
-                    if(response.status_code >= 400):
-                        raise Exception("Error adding linked records: " + response.text)
-
-                    update_records = []
-                
-                if record_id is None:
-                    break
-
-        # third pass, fill in the file fields
-        if not quiet: print("Uploading files...")
-        for br_table_id, table_data in files.items():
-            new_table_data = {}
-            for at_record_id, record_data in table_data.items():
-                br_record_id = record_map[at_record_id]
-                new_table_data[br_record_id] = record_data
-
-            files[br_table_id] = new_table_data
-            for br_record_id, record_data in new_table_data.items():
-                for br_field_id, at_files in record_data.items():
-                    for i, file_data in enumerate(at_files):
-                        file_content = requests.get(file_data["url"]).content
-                        response = requests.post(api_url + "/user-files/upload-file/", headers={ "Authorization": "Token " + baserow_token }, files={ "file": (file_data["filename"], file_content, file_data["type"]) })
-                        if(response.status_code >= 400):
-                            raise Exception("Error uploading file: " + response.text)
-
-                        at_files[i] = response.json()["name"]
-        
-            # now that we have mapped the baserow record ids and uploaded the files, we can fill in the file fields
-            update_records = []
-            iterator = (v for v in files[br_table_id].keys())
-            while True:
-                record_id = next(iterator, None)
-                if record_id is not None:
-                    file_fields = files[br_table_id][record_id]
-                    if len(file_fields) == 0:
-                        continue
-
-                    record = {
-                        "id": record_id,
-                    }
-
-                    for br_field_id, file_names in file_fields.items():
-                        record["field_" + str(br_field_id)] = list(map(lambda file_name : { "name": file_name }, file_names))
-                    
-                    update_records.append(record)
-
-                if len(update_records) > 0 and (len(update_records) > batch_size - 1 or record_id is None):
-                    response = requests.patch(api_url + f"/database/rows/table/{br_table_id}/batch/", headers={ "Authorization": "Token " + baserow_token }, json={ "items": update_records })
-                    if(response.status_code >= 400):
-                        raise Exception("Error adding files to records: " + response.text)
-
-                    update_records = []
-                
-                if record_id is None:
-                    break
+    api_url = baserow_url.strip("/") + "/api"
+    baserow_session = __create_session()
+    baserow_session.headers["Authorization"] = "Token " + baserow_token
+    # attachments are downloaded with a separate session, so the Baserow token is never sent to Airtable
+    airtable_session = __create_session()
+    # the Baserow fields data of each table, shared between bases that import into the same table
+    fields_data_cache = {}
+    # Airtable locks a base out for 30 seconds when it is rate limited, which several table workers listing records at once can cause,
+    # so keep backing off until the lockout is over instead of failing the import
+    airtable_retry = __RateLimitRetry(total=6, backoff_factor=1, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+    # set when importing any table fails, so the tables being imported at the same time stop making changes
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=table_workers) as table_executor, ThreadPoolExecutor(max_workers=upload_workers) as upload_executor:
+        for base_id, base_data in field_map["bases"].items():
+            if not quiet: print(f"Importing records from {base_id}...")
+            # first pass, create all the records without filling in the link fields or file fields
+            def create_table_records(table):
+                at_table_id, table_data = table
+                at_table = Table(airtable_token, base_id, at_table_id, retry_strategy=airtable_retry)
+                return __stop_on_failure(stop, __create_table_records, at_table, table_data["id"], table_data["fields"], conversion_functions, fields_data_cache, baserow_session, api_url, batch_size, stop)
+
+            tables = list(base_data["tables"].items())
+            created_tables = list(table_executor.map(create_table_records, tables))
+
+            record_map = {}
+            links = {}
+            files = {}
+            for (at_table_id, table_data), (table_record_map, table_links, table_files) in zip(tables, created_tables):
+                record_map.update(table_record_map)
+                links[table_data["id"]] = table_links
+                files[table_data["id"]] = table_files
+
+            # second pass, upload the files, and fill in the link fields and file fields
+            if not quiet: print("Mapping linked records and uploading files...")
+            def fill_table_links_and_files(br_table_id):
+                return __stop_on_failure(stop, __fill_table_links_and_files, br_table_id, links[br_table_id], files[br_table_id], record_map, upload_executor, baserow_session, airtable_session, api_url, batch_size, stop)
+
+            list(table_executor.map(fill_table_links_and_files, links.keys()))
     
     if not quiet: print("Done!")
 